@@ -1,5 +1,12 @@
+import argparse
+import functools
+import hashlib
+import json
 import os
+import shutil
 import subprocess
+import sys
+import tempfile
 import math
 
 # -------------------------------------------------------
@@ -9,39 +16,186 @@ RIGHTEOUS_SIZE_MB = 250  # target final size
 AUDIO_BITRATE_K = 96     # good enough for speech
 MIN_VIDEO_BITRATE_K = 150  # don't starve even the wicked
 MAX_VIDEO_BITRATE_K = 5000 # cap for innocent files
+FFMPEG = shutil.which("ffmpeg") or "ffmpeg"     # resolved once, not per spawn
+FFPROBE = shutil.which("ffprobe") or "ffprobe"
+X264_PRESET = "faster"     # ~3-4x quicker than medium at near-identical quality
+CRF = 23                   # libx264 quality for innocent files
+HW_CQ_OFFSET = 7           # hardware CQ ≈ CRF + 7 for similar quality
+VIDEOTOOLBOX_QUALITY = 60  # h264_videotoolbox -q:v (0-100, higher is better)
+# One small JSON probe result per input, keyed by (realpath, mtime, size)
+PROBE_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "video_tools", "analyzer"
+)
 
+# Derived once at import
+BYTES_PER_MB = 1024 * 1024
+RIGHTEOUS_SIZE_BITS = RIGHTEOUS_SIZE_MB * 8 * BYTES_PER_MB  # MB → bits
+INNOCENT_LIMIT_MB = RIGHTEOUS_SIZE_MB * 1.2
 
-def get_video_duration(path):
-    """Returns video duration in seconds using ffprobe."""
-    result = subprocess.run(
+# Checked in this order when --encoder auto
+HW_ENCODERS = {
+    "nvenc": "h264_nvenc",
+    "qsv": "h264_qsv",
+    "videotoolbox": "h264_videotoolbox",
+}
+
+
+def probe(cmd):
+    """Runs a short-lived ffprobe and returns its stdout; raises CalledProcessError on failure."""
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) as proc:
+        out, _ = proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    return out
+
+
+def probe_cache_entry(path):
+    """Cache file for path (one per real path) and the key its entry must match."""
+    real_path = os.path.realpath(path)
+    st = os.stat(path)
+    digest = hashlib.sha1(real_path.encode("utf-8", "surrogateescape")).hexdigest()
+    return os.path.join(PROBE_CACHE_DIR, f"{digest}.json"), f"{real_path}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def write_probe_cache(cache_path, entry):
+    """Write-then-rename, so a concurrent reader never sees a partial file."""
+    try:
+        os.makedirs(PROBE_CACHE_DIR, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=PROBE_CACHE_DIR, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_name, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_name)
+        except OSError:
+            pass
+
+
+@functools.cache
+def probe_video(path, use_cache=True):
+    """
+    One ffprobe per file: format duration plus the first video stream's size.
+    Memoized on disk by (realpath, mtime, size) unless use_cache is False.
+    """
+    if use_cache:
+        cache_path, key = probe_cache_entry(path)
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry.get("key") == key:
+                return entry["probe"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    out = probe(
         [
-            "ffprobe", "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", path
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True
+            FFPROBE, "-v", "error",
+            "-analyzeduration", "1M", "-probesize", "1M",
+            "-select_streams", "v:0",
+            "-print_format", "json", "-show_entries", "format=duration:stream=width,height", path
+        ]
     )
-    return float(result.stdout.strip())
+    result = json.loads(out)
+
+    try:
+        duration_s = float(result["format"]["duration"])
+    except (KeyError, TypeError, ValueError):
+        duration_s = 0
+    if use_cache and duration_s > 0:  # don't pin a bad probe until the file changes
+        write_probe_cache(cache_path, {"key": key, "probe": result})
+    return result
+
+
+def get_video_duration(path, use_cache=True):
+    """Returns video duration in seconds using ffprobe."""
+    return float(probe_video(path, use_cache)["format"]["duration"])
+
+
+def get_video_dimensions(path, use_cache=True):
+    """Returns (width, height) of the first video stream, or None if unknown."""
+    try:
+        stream = probe_video(path, use_cache)["streams"][0]
+        return int(stream["width"]), int(stream["height"])
+    except (subprocess.CalledProcessError, ValueError, KeyError, IndexError, TypeError):
+        return None
 
 
-def judge_sinfulness(input_path):
+def judge_sinfulness(input_path, use_cache=True):
     """Returns sin score (MB per minute) and duration."""
-    input_size_mb = os.path.getsize(input_path) / (1024 * 1024)
-    duration_s = get_video_duration(input_path)
+    input_size_mb = os.path.getsize(input_path) / BYTES_PER_MB
+    duration_s = get_video_duration(input_path, use_cache)
     sin_score = input_size_mb / (duration_s / 60)  # MB per minute
     return sin_score, input_size_mb, duration_s
 
 
 def compute_target_bitrate(duration_s):
     """Compute righteous bitrate needed to hit ~250MB final size."""
-    target_bits = RIGHTEOUS_SIZE_MB * 8 * 1024 * 1024   # MB → bits
-    bitrate_bps = target_bits / duration_s
-    bitrate_k = int(bitrate_bps / 1000)
-    return bitrate_k
+    return int(RIGHTEOUS_SIZE_BITS / duration_s / 1000)
 
 
-def compress_with_righteousness(input_path, output_path):
+@functools.cache
+def detect_hw_encoder():
+    """Returns the first usable hardware H.264 encoder key, or None."""
+    try:
+        listing = subprocess.run(
+            [FFMPEG, "-hide_banner", "-encoders"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).stdout
+    except OSError:
+        return None
+
+    for key, codec in HW_ENCODERS.items():
+        if codec not in listing:
+            continue
+        # Being compiled in doesn't mean the hardware is there; try a tiny encode.
+        trial = subprocess.run(
+            [
+                FFMPEG, "-hide_banner", "-v", "error",
+                "-f", "lavfi", "-i", "nullsrc=s=256x256:d=0.1",
+                "-c:v", codec, "-f", "null", "-"
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        if trial.returncode == 0:
+            return key
+    return None
+
+
+def encoder_params(encoder, preset, bitrate_k=None):
+    """
+    Video codec params for encoder ("cpu" or a HW_ENCODERS key).
+    Quality-based (CRF/CQ) when bitrate_k is None, else capped bitrate.
+    """
+    if encoder == "nvenc":
+        params = ["-c:v", "h264_nvenc", "-preset", "p4"]
+        quality = ["-rc", "vbr", "-cq", str(CRF + HW_CQ_OFFSET)]
+    elif encoder == "qsv":
+        params = ["-c:v", "h264_qsv", "-preset", preset]
+        quality = ["-global_quality", str(CRF + HW_CQ_OFFSET)]
+    elif encoder == "videotoolbox":
+        params = ["-c:v", "h264_videotoolbox"]
+        quality = ["-q:v", str(VIDEOTOOLBOX_QUALITY)]
+    else:
+        params = ["-c:v", "libx264", "-preset", preset, "-threads", "0"]
+        quality = ["-crf", str(CRF)]
+
+    if bitrate_k is None:
+        return params + quality
+    return params + [
+        "-b:v", f"{bitrate_k}k",
+        "-maxrate", f"{bitrate_k}k",
+        "-bufsize", f"{bitrate_k * 2}k"
+    ]
+
+
+def compress_with_righteousness(input_path, output_path, preset=X264_PRESET, encoder="auto", use_cache=True):
     """
     Applies the Whistler Doctrine:
     - Judge sinfulness
@@ -50,7 +204,7 @@ def compress_with_righteousness(input_path, output_path):
     - Produce righteous ~250MB output
     """
 
-    sin_score, size_mb, duration_s = judge_sinfulness(input_path)
+    sin_score, size_mb, duration_s = judge_sinfulness(input_path, use_cache)
     print(f"\n--- Whistler Compression Doctrine ---")
     print(f"Input Size: {size_mb:.2f} MB")
     print(f"Duration: {duration_s:.1f} sec")
@@ -60,15 +214,15 @@ def compress_with_righteousness(input_path, output_path):
     righteous_bitrate_k = compute_target_bitrate(duration_s)
     print(f"Righteous bitrate target: {righteous_bitrate_k} kbps total")
 
+    if encoder == "auto":
+        encoder = detect_hw_encoder() or "cpu"
+    print(f"Encoder: {encoder}")
+
     # Decide treatment
-    if size_mb < RIGHTEOUS_SIZE_MB * 1.2:
+    if size_mb < INNOCENT_LIMIT_MB:
         # Innocent: use CRF (quality-based)
         print("Judgment: Innocent. Applying gentle CRF compression.")
-        video_params = [
-            "-c:v", "libx264",
-            "-preset", "medium",
-            "-crf", "23"
-        ]
+        video_params = encoder_params(encoder, preset)
         audio_params = [
             "-c:a", "aac",
             "-b:a", f"{AUDIO_BITRATE_K}k"
@@ -84,25 +238,24 @@ def compress_with_righteousness(input_path, output_path):
 
         print(f"Assigned Video Bitrate: {video_bitrate_k} kbps")
 
-        video_params = [
-            "-c:v", "libx264",
-            "-b:v", f"{video_bitrate_k}k",
-            "-maxrate", f"{video_bitrate_k}k",
-            "-bufsize", f"{video_bitrate_k * 2}k",
-            "-preset", "medium"
-        ]
+        video_params = encoder_params(encoder, preset, video_bitrate_k)
         audio_params = [
             "-c:a", "aac",
             "-b:a", f"{AUDIO_BITRATE_K}k"
         ]
 
-    # Resolution scaling: gentle 720p downscale for wicked files
-    scale_params = [
-        "-vf", "scale='min(1280,iw)':-2"
-    ]
+    # Resolution scaling: gentle 720p downscale for wicked files.
+    # Skip the scaler when it would be a no-op (<=1280 wide, even dimensions).
+    dimensions = get_video_dimensions(input_path, use_cache)
+    if dimensions and dimensions[0] <= 1280 and dimensions[0] % 2 == 0 and dimensions[1] % 2 == 0:
+        scale_params = []
+    else:
+        scale_params = [
+            "-vf", "scale='min(1280,iw)':-2"
+        ]
 
     ffmpeg_cmd = [
-        "ffmpeg", "-i", input_path,
+        FFMPEG, "-i", input_path,
         *video_params,
         *audio_params,
         *scale_params,
@@ -120,4 +273,31 @@ def compress_with_righteousness(input_path, output_path):
 if __name__ == "__main__":
     INPUT = "output_compressed.mp4"
     OUTPUT = "output_righteous.mp4"
-    compress_with_righteousness(INPUT, OUTPUT)
+
+    parser = argparse.ArgumentParser(description="Compress a video to ~250MB (Whistler Doctrine)")
+    parser.add_argument("input", nargs="?", default=INPUT, help=f"Input video (default: {INPUT})")
+    parser.add_argument("output", nargs="?", default=OUTPUT, help=f"Output video (default: {OUTPUT})")
+    parser.add_argument("--preset", default=X264_PRESET, help=f"x264/qsv preset (default: {X264_PRESET})")
+    parser.add_argument(
+        "--encoder",
+        choices=["auto", "cpu", *HW_ENCODERS],
+        default="auto",
+        help="Video encoder; auto picks a working hardware encoder, else libx264 (default: auto)"
+    )
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Reuse cached probe results (default: true)"
+    )
+    args = parser.parse_args()
+
+    try:
+        compress_with_righteousness(
+            args.input, args.output, preset=args.preset, encoder=args.encoder, use_cache=args.cache
+        )
+    except FileNotFoundError as e:
+        if e.filename not in (FFMPEG, FFPROBE):
+            raise
+        print(f"{e.filename} not found; install ffmpeg and make sure it is on PATH", file=sys.stderr)
+        raise SystemExit(127)
@@ -1,13 +1,30 @@
 import argparse
+import asyncio
+import bisect
+import contextlib
+import hashlib
+import itertools
+import json
 import math
 import os
+import re
 import shlex
+import shutil
+import struct
 import subprocess
 import sys
 import tempfile
-from dataclasses import dataclass
+import threading
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional, TextIO, Union
+
+# Resolved once so each spawn skips the PATH walk; bare names keep the usual error if missing
+_FFMPEG = shutil.which("ffmpeg") or "ffmpeg"
+_FFPROBE = shutil.which("ffprobe") or "ffprobe"
+
+# One small JSON file per input, so lookups and writes never touch other entries
+_PROBE_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "video_tools" / "probe"
 
 
 @dataclass(frozen=True)
@@ -17,52 +34,292 @@ class MediaInfo:
     size_bytes: int
 
 
+@dataclass(frozen=True)
+class ChunkInfo:
+    duration_s: float
+    streams: tuple[str, ...]  # e.g. ("video:h264:1920x1080", "audio:aac")
+
+
 def _run(cmd: list[str]) -> None:
     print("\n$ " + " ".join(shlex.quote(c) for c in cmd))
     subprocess.run(cmd, check=True)
 
 
+def _probe(cmd: list[str]) -> str:
+    """Run a short-lived ffprobe and return its stdout; raises CalledProcessError on failure."""
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) as proc:
+        out, _ = proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    return out
+
+
+async def _run_async(cmd: list[str], sem: asyncio.Semaphore) -> None:
+    async with sem:
+        print("\n$ " + " ".join(shlex.quote(c) for c in cmd))
+        proc = await asyncio.create_subprocess_exec(*cmd)
+        returncode = await proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+
+async def _run_all(
+    cmds: list[list[str]],
+    sem: asyncio.Semaphore,
+    on_done: Optional[Callable[[int, Optional[Exception]], None]] = None,
+) -> list[Optional[BaseException]]:
+    """Run cmds bounded by sem; on_done(index, error) fires as each one finishes."""
+
+    async def run_one(i: int, cmd: list[str]) -> None:
+        try:
+            await _run_async(cmd, sem)
+        except Exception as e:
+            if on_done is not None:
+                on_done(i, e)
+            raise
+        if on_done is not None:
+            on_done(i, None)
+
+    # Let every ffmpeg finish (no orphaned children); callers surface failures.
+    return await asyncio.gather(*(run_one(i, cmd) for i, cmd in enumerate(cmds)), return_exceptions=True)
+
+
+def _raise_first_failure(results: list[Optional[BaseException]]) -> None:
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
+def _default_jobs() -> int:
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def _read_input_list(list_file: str) -> list[Path]:
+    """Input paths from a --from-file list: one per line, blank lines and # comments skipped."""
+    try:
+        lines = Path(list_file).expanduser().read_text(encoding="utf-8").splitlines()
+    except OSError as e:
+        raise SystemExit(f"Cannot read --from-file: {e}")
+    return [Path(line.strip()).expanduser().resolve() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def _check_batch_inputs(input_paths: list[Path]) -> None:
+    if not input_paths:
+        raise SystemExit("No input files found")
+
+    # Each input gets <out-dir>/<stem>/, so stems must be unique
+    stems = [p.stem for p in input_paths]
+    if len(set(stems)) != len(stems):
+        raise SystemExit("Input file names must be unique (chunks go to <out-dir>/<name>/)")
+
+
+@contextlib.contextmanager
+def _results_on_stdout() -> Iterator[TextIO]:
+    """Batch modes: stdout carries only JSON result lines; human-readable logs go to stderr."""
+    results_out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        yield results_out
+
+
+def _emit_result(results_out: TextIO, **fields: object) -> None:
+    """One JSON line per processed file, for downstream tools."""
+    print(json.dumps(fields), file=results_out, flush=True)
+
+
+def _error_text(error: BaseException) -> str:
+    if isinstance(error, subprocess.CalledProcessError):
+        return f"{Path(error.cmd[0]).name} exited with status {error.returncode}"
+    return str(error)
+
+
+def _is_input_error(error: BaseException) -> bool:
+    """Failures that belong to one input of a batch (bad file, failed probe/ffmpeg), not the whole run."""
+    if isinstance(error, OSError):
+        # A missing/unreadable input is per-file; a missing ffmpeg/ffprobe is not
+        return error.filename not in (_FFMPEG, _FFPROBE)
+    return isinstance(error, (SystemExit, subprocess.CalledProcessError, ValueError))
+
+
+def _emit_chunk_result(results_out: TextIO, args2: argparse.Namespace, error: Optional[Exception]) -> None:
+    _emit_result(
+        results_out,
+        input=args2.input,
+        out_dir=args2.out_dir,
+        segment_time=args2.segment_time,
+        segment_times=args2.segment_times,
+        ok=error is None,
+        error=None if error is None else _error_text(error),
+    )
+
+
+# S, M:S or H:M:S (hours only when minutes are present)
+_HMS_RE = re.compile(r"^\s*(?:(?:(\d+):)?(\d+):)?(\d+(?:\.\d*)?|\.\d+)\s*$")
+_DIGITS_RE = re.compile(r"(\d+)")
+
+_MP4_EXTS = {".mp4", ".m4v", ".m4a", ".mov"}
+_MKV_EXTS = {".mkv", ".mka", ".webm"}
+
+
+def _parse_mp4_duration(input_path: Path) -> Optional[float]:
+    """Read duration from the MP4/MOV `moov/mvhd` box. None if not found."""
+    with input_path.open("rb") as f:
+        file_end = f.seek(0, os.SEEK_END)
+        f.seek(0)
+
+        # Walk top-level boxes until moov, then its children until mvhd.
+        end = file_end
+        want = b"moov"
+        while f.tell() + 8 <= end:
+            box_start = f.tell()
+            size, box_type = struct.unpack(">I4s", f.read(8))
+            header = 8
+            if size == 1:
+                (size,) = struct.unpack(">Q", f.read(8))
+                header = 16
+            elif size == 0:
+                size = end - box_start
+            if size < header:
+                return None
+
+            if box_type == want == b"moov":
+                end = box_start + size
+                want = b"mvhd"
+                continue
+
+            if box_type == want == b"mvhd":
+                version = f.read(4)[0]
+                if version == 1:
+                    timescale, duration = struct.unpack(">16xIQ", f.read(28))
+                else:
+                    timescale, duration = struct.unpack(">8xII", f.read(16))
+                if timescale <= 0:
+                    return None
+                return duration / timescale
+
+            f.seek(box_start + size)
+
+    return None
+
+
+def _read_ebml_vint(f, keep_marker: bool) -> Optional[int]:
+    first = f.read(1)
+    if not first:
+        return None
+    b0 = first[0]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not (b0 & mask):
+        length += 1
+        mask >>= 1
+    if length > 8:
+        return None
+    value = b0 if keep_marker else b0 & (mask - 1)
+    rest = f.read(length - 1)
+    if len(rest) != length - 1:
+        return None
+    for b in rest:
+        value = (value << 8) | b
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return -1  # unknown size
+    return value
+
+
+def _parse_mkv_duration(input_path: Path) -> Optional[float]:
+    """Read duration from the Matroska/WebM `Segment/Info` element. None if not found."""
+    SEGMENT = 0x18538067
+    INFO = 0x1549A966
+    TIMECODE_SCALE = 0x2AD7B1
+    DURATION = 0x4489
+    CLUSTER = 0x1F43B675
+
+    with input_path.open("rb") as f:
+        file_end = f.seek(0, os.SEEK_END)
+        f.seek(0)
+
+        end = file_end
+        in_info = False
+        timecode_scale = 1_000_000
+        duration: Optional[float] = None
+        while f.tell() < end:
+            elem_id = _read_ebml_vint(f, keep_marker=True)
+            elem_size = _read_ebml_vint(f, keep_marker=False)
+            if elem_id is None or elem_size is None:
+                return None
+            data_start = f.tell()
+
+            if elem_id == SEGMENT and not in_info:
+                # Descend; an unknown-size Segment runs to end of file.
+                if elem_size >= 0:
+                    end = min(end, data_start + elem_size)
+                continue
+
+            if elem_size < 0:
+                return None
+
+            if elem_id == INFO and not in_info:
+                in_info = True
+                end = data_start + elem_size
+                continue
+
+            if in_info and elem_id == TIMECODE_SCALE:
+                timecode_scale = int.from_bytes(f.read(elem_size), "big")
+            elif in_info and elem_id == DURATION:
+                if elem_size == 4:
+                    (duration,) = struct.unpack(">f", f.read(4))
+                elif elem_size == 8:
+                    (duration,) = struct.unpack(">d", f.read(8))
+            elif elem_id == CLUSTER:
+                # A Cluster before Info means we would have to scan media data; give up.
+                return None
+
+            f.seek(data_start + elem_size)
+
+    if duration is None:
+        return None
+    return duration * timecode_scale / 1e9
+
+
 def _ffprobe_media_info(input_path: Path) -> MediaInfo:
     size_bytes = input_path.stat().st_size
 
-    # duration
-    duration_out = subprocess.run(
-        [
-            "ffprobe",
-            "-v",
-            "error",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            str(input_path),
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        check=True,
-    ).stdout.strip()
+    # Read duration straight from the container header when we can; no ffprobe fork.
+    ext = input_path.suffix.lower()
+    header_duration_s: Optional[float] = None
+    try:
+        if ext in _MP4_EXTS:
+            header_duration_s = _parse_mp4_duration(input_path)
+        elif ext in _MKV_EXTS:
+            header_duration_s = _parse_mkv_duration(input_path)
+    except (OSError, struct.error, IndexError):
+        header_duration_s = None
 
-    duration_s = float(duration_out)
+    if header_duration_s is not None and header_duration_s > 0:
+        return MediaInfo(duration_s=header_duration_s, bit_rate_bps=None, size_bytes=size_bytes)
 
-    # bit_rate may be missing for some containers; treat as optional
-    bit_rate_out = subprocess.run(
+    # duration + bit_rate in a single probe; cap probesize so large files return fast
+    probe_out = _probe(
         [
-            "ffprobe",
+            _FFPROBE,
             "-v",
             "error",
+            "-analyzeduration",
+            "1M",
+            "-probesize",
+            "1M",
+            "-print_format",
+            "json",
             "-show_entries",
-            "format=bit_rate",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
+            "format=duration,bit_rate",
             str(input_path),
-        ],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        check=True,
-    ).stdout.strip()
+        ]
+    )
+
+    fields = json.loads(probe_out).get("format", {})
+
+    duration_s = float(fields.get("duration", ""))
 
+    # bit_rate may be missing for some containers; treat as optional
+    bit_rate_out = str(fields.get("bit_rate", "")).strip()
     bit_rate_bps: Optional[int]
     if bit_rate_out:
         try:
@@ -75,20 +332,193 @@ def _ffprobe_media_info(input_path: Path) -> MediaInfo:
     return MediaInfo(duration_s=duration_s, bit_rate_bps=bit_rate_bps, size_bytes=size_bytes)
 
 
-def _parse_hms_to_seconds(value: str) -> float:
-    """Parse seconds or HH:MM:SS[.ms] into seconds."""
-    value = value.strip()
-    if ":" not in value:
-        return float(value)
+def _probe_cache_entry(input_path: Path) -> tuple[Path, str]:
+    """Cache file for input_path (one per real path) and the key its entry must match."""
+    real_path = os.path.realpath(input_path)
+    st = input_path.stat()
+    digest = hashlib.sha1(real_path.encode("utf-8", "surrogateescape")).hexdigest()
+    return _PROBE_CACHE_DIR / f"{digest}.json", f"{real_path}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def _read_probe_cache(input_path: Path) -> tuple[Path, str, dict]:
+    """Cache file, key and stored entry for input_path; the entry is {} if missing or stale."""
+    cache_path, key = _probe_cache_entry(input_path)
+    try:
+        entry = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return cache_path, key, {}
+    if not isinstance(entry, dict) or entry.get("key") != key:
+        return cache_path, key, {}
+    return cache_path, key, entry
+
+
+def _write_probe_cache(cache_path: Path, entry: dict) -> None:
+    # Write-then-rename so concurrent readers never see a partial file; a stale
+    # entry for the same path (older mtime/size) is simply replaced.
+    try:
+        _PROBE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=_PROBE_CACHE_DIR, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_name, cache_path)
+    except OSError:
+        Path(tmp_name).unlink(missing_ok=True)
 
-    parts = value.split(":")
-    if len(parts) != 3:
+
+def _media_info(input_path: Path, use_cache: bool = True) -> MediaInfo:
+    """_ffprobe_media_info, memoized on disk by (realpath, mtime, size)."""
+    if not use_cache:
+        return _ffprobe_media_info(input_path)
+
+    cache_path, key, entry = _read_probe_cache(input_path)
+    try:
+        return MediaInfo(**entry["info"])
+    except (KeyError, TypeError):
+        pass
+
+    info = _ffprobe_media_info(input_path)
+    if info.duration_s <= 0:
+        return info  # don't pin a bad probe until the file changes
+
+    _write_probe_cache(cache_path, {"key": key, "info": asdict(info)})
+    return info
+
+
+def _parse_hms_to_seconds(value: str) -> float:
+    """Parse seconds, MM:SS or HH:MM:SS[.ms] into seconds."""
+    m = _HMS_RE.match(value)
+    if m is None:
         raise ValueError("Expected HH:MM:SS or seconds")
 
-    hours = float(parts[0])
-    minutes = float(parts[1])
-    seconds = float(parts[2])
-    return hours * 3600 + minutes * 60 + seconds
+    hours, minutes, seconds = m.groups(default="0")
+    return float(hours) * 3600 + float(minutes) * 60 + float(seconds)
+
+
+@dataclass(frozen=True)
+class PacketCurve:
+    keyframes: list[float]  # video keyframe PTS (s), sorted
+    times: list[float]  # PTS (s) of every packet, sorted
+    cum_bytes: list[int]  # payload bytes up to and including times[i]
+
+
+def _packet_curve(input_path: Path) -> PacketCurve:
+    """One pass over packet headers (no decoding): keyframes plus the cumulative-bytes curve."""
+    out = _probe(
+        [
+            _FFPROBE,
+            "-v",
+            "error",
+            "-show_entries",
+            "packet=codec_type,pts_time,dts_time,size,flags",
+            "-of",
+            "compact=p=0",
+            str(input_path),
+        ]
+    )
+
+    keyframes = []
+    packets = []
+    for line in out.splitlines():
+        fields = dict(kv.split("=", 1) for kv in line.split("|") if "=" in kv)
+        pts_time = fields.get("pts_time", "N/A")
+        try:
+            t = float(pts_time if pts_time != "N/A" else fields.get("dts_time", ""))
+            size = int(fields.get("size", ""))
+        except ValueError:
+            continue
+        packets.append((t, size))
+        if fields.get("codec_type") == "video" and "K" in fields.get("flags", ""):
+            keyframes.append(t)
+
+    keyframes.sort()
+    packets.sort()
+    return PacketCurve(
+        keyframes=keyframes,
+        times=[t for t, _ in packets],
+        cum_bytes=list(itertools.accumulate(size for _, size in packets)),
+    )
+
+
+def _plan_cuts(curve: PacketCurve, target_bytes: int, min_s: float, max_s: float) -> list[float]:
+    """
+    Cut points where each chunk holds ~target_bytes of packets, clamped to [min_s, max_s]
+    and moved to the nearest keyframe (stream copy can only cut there). Returned times
+    are relative to the first packet, as -segment_times expects.
+    """
+    keyframes, times, cum_bytes = curve.keyframes, curve.times, curve.cum_bytes
+    if not keyframes or not times:
+        return []
+
+    cuts: list[float] = []
+    last = keyframes[0]
+    while True:
+        i = bisect.bisect_left(times, last)
+        start_bytes = cum_bytes[i - 1] if i > 0 else 0
+        j = bisect.bisect_left(cum_bytes, start_bytes + target_bytes)
+        # Past the end: the remainder is one chunk unless max_s forces another cut
+        target = times[j] if j < len(times) else math.inf
+        target = min(max(target, last + min_s), last + max_s)
+        if target >= times[-1]:
+            break
+
+        k = bisect.bisect_left(keyframes, target)
+        nearest = min(keyframes[max(k - 1, 0) : k + 1], key=lambda kf: abs(kf - target))
+        if nearest <= last:
+            # Nearest keyframe is the previous cut; take the next one instead
+            k = bisect.bisect_right(keyframes, last)
+            if k == len(keyframes):
+                break
+            nearest = keyframes[k]
+        cuts.append(nearest)
+        last = nearest
+
+    # ffmpeg rebases output timestamps to the input start time (no -copyts), so make cuts
+    # relative to the first packet; floor to ms so they never land just past the keyframe PTS.
+    origin = times[0]
+    rel_cuts = [math.floor((c - origin) * 1000) / 1000 for c in cuts]
+    return [c for c in rel_cuts if c > 0]
+
+
+def _packet_planned_cuts(
+    input_path: Path, info: MediaInfo, target_mb: float, min_s: float, max_s: float, use_cache: bool = True
+) -> list[float]:
+    """
+    _plan_cuts over the input's packet curve. The curve scan reads every packet header,
+    so the cuts are memoized in the input's probe cache entry, per (target, min, max).
+    """
+    plan_key = f"{target_mb}:{min_s}:{max_s}"
+    if use_cache:
+        cache_path, key, entry = _read_probe_cache(input_path)
+        cached = entry.get("cuts")
+        if isinstance(cached, dict) and isinstance(cached.get(plan_key), list):
+            return cached[plan_key]
+
+    curve = _packet_curve(input_path)
+    cuts: list[float] = []
+    if info.size_bytes > 0 and curve.cum_bytes and curve.cum_bytes[-1] > 0:
+        # Scale so container overhead is accounted for
+        payload_bytes = int(target_mb * 1024 * 1024 * curve.cum_bytes[-1] / info.size_bytes)
+        cuts = _plan_cuts(curve, payload_bytes, min_s, max_s)
+
+    if use_cache:
+        entry = entry or {"key": key, "info": asdict(info)}
+        if not isinstance(entry.get("cuts"), dict):
+            entry["cuts"] = {}
+        entry["cuts"][plan_key] = cuts
+        _write_probe_cache(cache_path, entry)
+    return cuts
+
+
+def _fast_seek_args(start_s: float) -> list[str]:
+    """
+    Input-side seek (place before -i): index lookup instead of demuxing up to start_s.
+    The speedup comes from -ss before -i alone; stream copy then starts on the keyframe
+    at or before start_s, and a re-encode still trims to the exact frame.
+    """
+    return ["-ss", str(start_s)]
 
 
 def _default_output_ext(input_path: Path) -> str:
@@ -96,7 +526,7 @@ def _default_output_ext(input_path: Path) -> str:
     return ext if ext else ".mp4"
 
 
-def cmd_chunk_time(args: argparse.Namespace) -> None:
+def _chunk_time_cmd(args: argparse.Namespace) -> list[str]:
     input_path = Path(args.input).expanduser().resolve()
     if not input_path.exists():
         raise SystemExit(f"Input not found: {input_path}")
@@ -104,9 +534,19 @@ def cmd_chunk_time(args: argparse.Namespace) -> None:
     out_dir = Path(args.out_dir).expanduser().resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    segment_s = _parse_hms_to_seconds(args.segment_time)
-    if segment_s <= 0:
-        raise SystemExit("--segment-time must be > 0")
+    if args.segment_times:
+        try:
+            cut_points = [float(t) for t in args.segment_times.split(",")]
+        except ValueError:
+            raise SystemExit("--segment-times must be a comma-separated list of seconds")
+        if any(t <= 0 for t in cut_points) or cut_points != sorted(cut_points):
+            raise SystemExit("--segment-times must be increasing and > 0")
+        segment_args = ["-segment_times", ",".join(str(t) for t in cut_points)]
+    else:
+        segment_s = _parse_hms_to_seconds(args.segment_time)
+        if segment_s <= 0:
+            raise SystemExit("--segment-time must be > 0")
+        segment_args = ["-segment_time", str(segment_s)]
 
     ext = args.ext or _default_output_ext(input_path)
     if not ext.startswith("."):
@@ -114,7 +554,15 @@ def cmd_chunk_time(args: argparse.Namespace) -> None:
 
     template = str(out_dir / f"{args.prefix}_%03d{ext}")
 
-    cmd = ["ffmpeg", "-hide_banner", "-y", "-i", str(input_path)]
+    cmd = [_FFMPEG, "-hide_banner", "-y", "-fflags", "+genpts"]
+    if args.start:
+        # _HMS_RE has no sign, so a negative offset fails to parse too
+        try:
+            start_s = _parse_hms_to_seconds(args.start)
+        except ValueError:
+            raise SystemExit("--start must be seconds, MM:SS or HH:MM:SS and >= 0")
+        cmd += _fast_seek_args(start_s)
+    cmd += ["-i", str(input_path)]
     if args.copy:
         cmd += ["-map", "0", "-c", "copy"]
     else:
@@ -128,6 +576,8 @@ def cmd_chunk_time(args: argparse.Namespace) -> None:
             "veryfast",
             "-crf",
             "23",
+            "-threads",
+            "0",
             "-c:a",
             "aac",
             "-b:a",
@@ -137,24 +587,55 @@ def cmd_chunk_time(args: argparse.Namespace) -> None:
     cmd += [
         "-f",
         "segment",
-        "-segment_time",
-        str(segment_s),
+        *segment_args,
         "-reset_timestamps",
         "1",
-        template,
     ]
+    if ext.lower() in _MP4_EXTS:
+        # moov atom up front so players can start without seeking to the end
+        cmd += ["-segment_format_options", "movflags=+faststart"]
+    cmd += [template]
 
-    _run(cmd)
+    return cmd
 
 
-def cmd_chunk_size(args: argparse.Namespace) -> None:
-    input_path = Path(args.input).expanduser().resolve()
-    if not input_path.exists():
-        raise SystemExit(f"Input not found: {input_path}")
+def cmd_chunk_time(args: argparse.Namespace) -> None:
+    if bool(args.input) == bool(args.from_file):
+        raise SystemExit("Provide either an input file OR --from-file")
 
-    info = _ffprobe_media_info(input_path)
+    if not args.from_file:
+        _run(_chunk_time_cmd(args))
+        return
+
+    if args.jobs < 1:
+        raise SystemExit("--jobs must be >= 1")
+
+    input_paths = _read_input_list(args.from_file)
+    _check_batch_inputs(input_paths)
+
+    out_root = Path(args.out_dir).expanduser().resolve()
+    all_args = [
+        argparse.Namespace(**{**vars(args), "input": str(p), "out_dir": str(out_root / p.stem)}) for p in input_paths
+    ]
+    cmds = [_chunk_time_cmd(args2) for args2 in all_args]
+
+    with _results_on_stdout() as results_out:
+
+        async def run() -> list[Optional[BaseException]]:
+            return await _run_all(
+                cmds,
+                asyncio.Semaphore(args.jobs),
+                on_done=lambda i, error: _emit_chunk_result(results_out, all_args[i], error),
+            )
+
+        results = asyncio.run(run())
+    _raise_first_failure(results)
+
+
+def _plan_chunk_size(input_path: Path, info: MediaInfo, args: argparse.Namespace) -> float:
+    """Estimate the segment time that yields ~args.target_mb chunks, and print the plan."""
     if info.duration_s <= 0:
-        raise SystemExit("Could not determine duration")
+        raise SystemExit(f"Could not determine duration: {input_path}")
 
     # Prefer container-reported bitrate; fallback to size/duration.
     if info.bit_rate_bps and info.bit_rate_bps > 0:
@@ -179,22 +660,262 @@ def cmd_chunk_size(args: argparse.Namespace) -> None:
     chunk_s = max(chunk_s, 1.0)
 
     print("\n--- chunk-size plan ---")
+    print(f"input: {input_path}")
     print(f"duration: {info.duration_s:.3f}s")
     print(f"size: {info.size_bytes / (1024 * 1024):.2f}MB")
     print(f"bitrate: {bitrate_bps / 1_000:.1f} kbps")
     print(f"target: {args.target_mb}MB")
     print(f"segment_time: {chunk_s:.3f}s")
+    return chunk_s
 
-    # Delegate to chunk-time
-    args2 = argparse.Namespace(
+
+def _fixed_segment_time(args: argparse.Namespace) -> Optional[float]:
+    """Segment time when --min-seconds == --max-seconds pins it; no probe needed then."""
+    # Validate here too: the shortcut bypasses _plan_chunk_size
+    if float(args.target_mb) <= 0:
+        raise SystemExit("--target-mb must be > 0")
+    if args.min_seconds is not None and args.max_seconds is not None and args.min_seconds == args.max_seconds:
+        chunk_s = max(float(args.min_seconds), 1.0)
+        print(f"\nsegment_time: {chunk_s:.3f}s (fixed by --min/--max-seconds; skipped probe)")
+        return chunk_s
+    return None
+
+
+def _chunk_time_args(
+    input_path: Path, info: Optional[MediaInfo], chunk_s: float, out_dir: str, args: argparse.Namespace
+) -> argparse.Namespace:
+    segment_times = None
+    if info is not None and args.copy and args.snap_keyframes:
+        # Size chunks from actual packet bytes (VBR-aware) instead of the average bitrate.
+        min_s = max(float(args.min_seconds or 0), 1.0)
+        max_s = float(args.max_seconds) if args.max_seconds is not None else math.inf
+        cuts = _packet_planned_cuts(input_path, info, float(args.target_mb), min_s, max_s, args.cache)
+        if cuts:
+            segment_times = ",".join(str(c) for c in cuts)
+            print(f"packet-planned keyframe cuts: {len(cuts)}")
+
+    return argparse.Namespace(
         input=str(input_path),
-        out_dir=args.out_dir,
+        out_dir=out_dir,
         prefix=args.prefix,
         segment_time=str(chunk_s),
+        segment_times=segment_times,
+        start=None,
         copy=args.copy,
         ext=args.ext,
     )
-    cmd_chunk_time(args2)
+
+
+def cmd_chunk_size(args: argparse.Namespace) -> None:
+    if bool(args.input) == bool(args.from_file):
+        raise SystemExit("Provide either an input file OR --from-file")
+
+    if args.from_file:
+        _run_batch_chunk_size(_read_input_list(args.from_file), args)
+        return
+
+    input_path = Path(args.input).expanduser().resolve()
+    if not input_path.exists():
+        raise SystemExit(f"Input not found: {input_path}")
+
+    info: Optional[MediaInfo] = None
+    chunk_s = _fixed_segment_time(args)
+    if chunk_s is None:
+        info = _media_info(input_path, use_cache=args.cache)
+        chunk_s = _plan_chunk_size(input_path, info, args)
+
+    # Delegate to chunk-time
+    _run(_chunk_time_cmd(_chunk_time_args(input_path, info, chunk_s, args.out_dir, args)))
+
+
+async def _batch_chunk_size(input_paths: list[Path], args: argparse.Namespace, results_out: TextIO) -> bool:
+    """
+    Probe, plan and split every input. An input that fails gets an "ok": false line and
+    the rest carry on; returns False if any input failed before reaching ffmpeg.
+    """
+    # One semaphore bounds both probes and ffmpeg runs; never spawn unbounded.
+    sem = asyncio.Semaphore(args.jobs)
+
+    async def in_thread(fn: Callable, *fn_args: object) -> object:
+        async with sem:
+            try:
+                return await asyncio.to_thread(fn, *fn_args)
+            except SystemExit as e:
+                return e  # raised out of a task, SystemExit would stop the event loop
+
+    # Inputs still in the running, by index; failed ones are reported and dropped
+    pending = dict(enumerate(input_paths))
+
+    def drop(i: int, error: BaseException) -> None:
+        if not _is_input_error(error):
+            raise error
+        p = pending.pop(i)
+        print(f"{p}: {_error_text(error)}")
+        _emit_result(results_out, input=str(p), ok=False, error=_error_text(error))
+
+    infos: dict[int, Optional[MediaInfo]] = dict.fromkeys(pending)
+    chunk_secs: dict[int, float] = {}
+    fixed_s = _fixed_segment_time(args)
+    if fixed_s is None:
+        probed = await asyncio.gather(
+            *(in_thread(_media_info, p, args.cache) for p in pending.values()), return_exceptions=True
+        )
+        for i, info in zip(list(pending), probed):
+            try:
+                if isinstance(info, BaseException):
+                    raise info
+                chunk_secs[i] = _plan_chunk_size(pending[i], info, args)
+                infos[i] = info
+            except BaseException as e:
+                drop(i, e)
+    else:
+        chunk_secs = dict.fromkeys(pending, fixed_s)
+
+    out_root = Path(args.out_dir).expanduser().resolve()
+    planned = await asyncio.gather(
+        *(
+            in_thread(_chunk_time_args, p, infos[i], chunk_secs[i], str(out_root / p.stem), args)
+            for i, p in pending.items()
+        ),
+        return_exceptions=True,
+    )
+    all_args: list[argparse.Namespace] = []
+    cmds: list[list[str]] = []
+    for i, args2 in zip(list(pending), planned):
+        try:
+            if isinstance(args2, BaseException):
+                raise args2
+            cmds.append(_chunk_time_cmd(args2))
+            all_args.append(args2)
+        except BaseException as e:
+            drop(i, e)
+
+    results = await _run_all(
+        cmds, sem, on_done=lambda i, error: _emit_chunk_result(results_out, all_args[i], error)
+    )
+    _raise_first_failure(results)
+    return len(pending) == len(input_paths)
+
+
+def _run_batch_chunk_size(input_paths: list[Path], args: argparse.Namespace) -> None:
+    if args.jobs < 1:
+        raise SystemExit("--jobs must be >= 1")
+
+    _check_batch_inputs(input_paths)
+    with _results_on_stdout() as results_out:
+        all_ok = asyncio.run(_batch_chunk_size(input_paths, args, results_out))
+    if not all_ok:
+        raise SystemExit(1)
+
+
+def cmd_batch_chunk_size(args: argparse.Namespace) -> None:
+    input_paths = [Path(p).expanduser().resolve() for p in args.inputs]
+    if args.from_file:
+        input_paths += _read_input_list(args.from_file)
+    _run_batch_chunk_size(input_paths, args)
+
+
+def _natural_sort_key(name: str) -> list:
+    """Sort key that orders chunk_9 before chunk_10."""
+    return [int(part) if part.isdigit() else part for part in _DIGITS_RE.split(name)]
+
+
+def _concat_quote(path: str) -> str:
+    """Quote a path for the concat demuxer: single quotes, with ' written as '\\''."""
+    return "'" + path.replace("'", "'\\''") + "'"
+
+
+def _write_concat_list(list_path: Path, inputs: list[Path]) -> None:
+    with open(list_path, "w", encoding="utf-8") as f:
+        for p in inputs:
+            f.write(f"file {_concat_quote(p.as_posix())}\n")
+
+
+def _feed_concat_fifo(fifo_path: Path, inputs: list[Path]) -> None:
+    # Blocks until ffmpeg opens the FIFO for reading
+    try:
+        _write_concat_list(fifo_path, inputs)
+    except OSError:
+        pass  # reader went away (e.g. ffmpeg failed mid-read)
+
+
+async def _probe_chunk(path: Path, sem: asyncio.Semaphore) -> ChunkInfo:
+    async with sem:
+        proc = await asyncio.create_subprocess_exec(
+            _FFPROBE,
+            "-v",
+            "error",
+            "-print_format",
+            "json",
+            "-show_entries",
+            "format=duration:stream=codec_type,codec_name,width,height",
+            str(path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        out, _ = await proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, [_FFPROBE, str(path)])
+
+    probe = json.loads(out)
+    streams = []
+    for st in probe.get("streams", []):
+        sig = f"{st.get('codec_type')}:{st.get('codec_name')}"
+        if st.get("codec_type") == "video":
+            sig += f":{st.get('width')}x{st.get('height')}"
+        streams.append(sig)
+    try:
+        duration_s = float(probe.get("format", {}).get("duration", ""))
+    except ValueError:
+        duration_s = 0.0
+    return ChunkInfo(duration_s=duration_s, streams=tuple(streams))
+
+
+async def _probe_all(paths: list[Path], jobs: int) -> list[Union[ChunkInfo, BaseException]]:
+    # Collect failures instead of raising mid-gather, so no task is left unretrieved
+    sem = asyncio.Semaphore(jobs)
+    return await asyncio.gather(*(_probe_chunk(p, sem) for p in paths), return_exceptions=True)
+
+
+def _check_concat_inputs(inputs: list[Path], jobs: int, copy: bool) -> None:
+    """Probe all inputs concurrently; with stream copy, require matching codecs/dimensions."""
+    if jobs < 1:
+        raise SystemExit("--jobs must be >= 1")
+
+    results = asyncio.run(_probe_all(inputs, jobs))
+    infos: list[ChunkInfo] = []
+    for p, result in zip(inputs, results):
+        if isinstance(result, (subprocess.CalledProcessError, ValueError)):
+            raise SystemExit(f"ffprobe failed on {p}")
+        if isinstance(result, BaseException):
+            raise result
+        infos.append(result)
+
+    print("\n--- concat inputs ---")
+    for p, info in zip(inputs, infos):
+        print(f"{p.name}: {info.duration_s:.3f}s {' '.join(info.streams)}")
+    print(f"total: {sum(i.duration_s for i in infos):.3f}s in {len(infos)} files")
+
+    if copy:
+        expected = infos[0].streams
+        mismatched = [p for p, info in zip(inputs, infos) if info.streams != expected]
+        if mismatched:
+            names = ", ".join(p.name for p in mismatched)
+            raise SystemExit(f"Streams differ from {inputs[0].name} in: {names} (use --no-copy to re-encode)")
+
+
+def _release_fifo_writer(fifo_path: Path, writer: threading.Thread) -> None:
+    """Unblock a FIFO writer whose reader never showed up (e.g. ffmpeg failed before opening it)."""
+    fd = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+    try:
+        while writer.is_alive():
+            try:
+                os.read(fd, 65536)
+            except BlockingIOError:
+                pass
+            writer.join(timeout=0.05)
+    finally:
+        os.close(fd)
 
 
 def cmd_concat(args: argparse.Namespace) -> None:
@@ -202,22 +923,43 @@ def cmd_concat(args: argparse.Namespace) -> None:
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
     inputs: list[Path]
-    if bool(args.dir) == bool(args.inputs):
-        raise SystemExit("Provide either --dir OR one or more input files")
+    if bool(args.dir) + bool(args.inputs) + bool(args.from_file) != 1:
+        raise SystemExit("Provide either --dir, --from-file OR one or more input files")
 
     if args.dir:
         in_dir = Path(args.dir).expanduser().resolve()
         if not in_dir.exists():
             raise SystemExit(f"Directory not found: {in_dir}")
-        inputs = sorted(p for p in in_dir.iterdir() if p.is_file())
+        ext = None
         if args.ext:
-            ext = args.ext
-            if not ext.startswith("."):
-                ext = "." + ext
-            inputs = [p for p in inputs if p.suffix.lower() == ext.lower()]
+            ext = args.ext if args.ext.startswith(".") else "." + args.ext
+        # scandir reuses the dirent type; no extra stat per entry
+        with os.scandir(in_dir) as it:
+            names = [
+                e.name
+                for e in it
+                if e.is_file() and (ext is None or os.path.splitext(e.name)[1].lower() == ext.lower())
+            ]
+        inputs = [in_dir / name for name in sorted(names, key=_natural_sort_key)]
+    elif args.from_file:
+        inputs = _read_input_list(args.from_file)
     else:
         inputs = [Path(p).expanduser().resolve() for p in args.inputs]
 
+    if not args.from_file:
+        _concat(args, inputs, out_path)
+        return
+
+    with _results_on_stdout() as results_out:
+        ok = False
+        try:
+            _concat(args, inputs, out_path)
+            ok = True
+        finally:
+            _emit_result(results_out, output=str(out_path), inputs=len(inputs), ok=ok)
+
+
+def _concat(args: argparse.Namespace, inputs: list[Path], out_path: Path) -> None:
     if not inputs:
         raise SystemExit("No input files found")
 
@@ -225,16 +967,23 @@ def cmd_concat(args: argparse.Namespace) -> None:
         if not p.exists():
             raise SystemExit(f"Missing input: {p}")
 
-    # concat demuxer expects a list file
-    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
-        list_path = Path(f.name)
-        for p in inputs:
-            # Use POSIX-style quoting; ffmpeg's concat demuxer supports this
-            f.write(f"file {p.as_posix()!r}\n")
+    if args.check:
+        _check_concat_inputs(inputs, args.jobs, args.copy)
+
+    # concat demuxer expects a list file; on POSIX stream it through a FIFO instead of disk
+    list_dir = Path(tempfile.mkdtemp(prefix="video_tools_concat_"))
+    list_path = list_dir / "list.txt"
+    writer: Optional[threading.Thread] = None
+    if hasattr(os, "mkfifo"):
+        os.mkfifo(list_path)
+        writer = threading.Thread(target=_feed_concat_fifo, args=(list_path, inputs), daemon=True)
+        writer.start()
+    else:
+        _write_concat_list(list_path, inputs)
 
     try:
         cmd = [
-            "ffmpeg",
+            _FFMPEG,
             "-hide_banner",
             "-y",
             "-f",
@@ -252,9 +1001,11 @@ def cmd_concat(args: argparse.Namespace) -> None:
                 "-c:v",
                 "libx264",
                 "-preset",
-                "medium",
+                args.preset,
                 "-crf",
                 "23",
+                "-threads",
+                "0",
                 "-c:a",
                 "aac",
                 "-b:a",
@@ -264,10 +1015,9 @@ def cmd_concat(args: argparse.Namespace) -> None:
         cmd += [str(out_path)]
         _run(cmd)
     finally:
-        try:
-            list_path.unlink(missing_ok=True)
-        except Exception:
-            pass
+        if writer is not None:
+            _release_fifo_writer(list_path, writer)
+        shutil.rmtree(list_dir, ignore_errors=True)
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -278,16 +1028,22 @@ def build_parser() -> argparse.ArgumentParser:
     sub = p.add_subparsers(dest="cmd", required=True)
 
     p_time = sub.add_parser("chunk-time", help="Split into N-second chunks (fast)")
-    p_time.add_argument("input", help="Input video path")
-    p_time.add_argument("--segment-time", required=True, help="Seconds or HH:MM:SS")
+    p_time.add_argument("input", nargs="?", help="Input video path")
+    p_time.add_argument("--from-file", help="Process every input listed in this file (one path per line)")
+    p_time_split = p_time.add_mutually_exclusive_group(required=True)
+    p_time_split.add_argument("--segment-time", help="Seconds, MM:SS or HH:MM:SS")
+    p_time_split.add_argument("--segment-times", help="Comma-separated cut points in seconds (relative to --start, if given)")
+    p_time.add_argument("--start", default=None, help="Start chunking at this offset (seconds, MM:SS or HH:MM:SS); --segment-times are then measured from it")
     p_time.add_argument("--out-dir", default="chunks", help="Output directory")
     p_time.add_argument("--prefix", default="chunk", help="Output file prefix")
     p_time.add_argument("--ext", default=None, help="Output extension (default: input ext)")
     p_time.add_argument("--copy", action=argparse.BooleanOptionalAction, default=True, help="Stream copy (default: true)")
+    p_time.add_argument("--jobs", type=int, default=_default_jobs(), help="Max concurrent ffmpeg processes with --from-file (default: half the CPUs)")
     p_time.set_defaults(func=cmd_chunk_time)
 
     p_size = sub.add_parser("chunk-size", help="Split into ~target-MB chunks (approx)")
-    p_size.add_argument("input", help="Input video path")
+    p_size.add_argument("input", nargs="?", help="Input video path")
+    p_size.add_argument("--from-file", help="Process every input listed in this file (one path per line)")
     p_size.add_argument("--target-mb", required=True, type=float, help="Approx target chunk size in MB")
     p_size.add_argument("--out-dir", default="chunks", help="Output directory")
     p_size.add_argument("--prefix", default="chunk", help="Output file prefix")
@@ -295,14 +1051,36 @@ def build_parser() -> argparse.ArgumentParser:
     p_size.add_argument("--copy", action=argparse.BooleanOptionalAction, default=True, help="Stream copy (default: true)")
     p_size.add_argument("--min-seconds", type=float, default=None, help="Clamp segment time minimum")
     p_size.add_argument("--max-seconds", type=float, default=None, help="Clamp segment time maximum")
+    p_size.add_argument("--snap-keyframes", action=argparse.BooleanOptionalAction, default=True, help="With --copy, plan cuts from per-packet sizes and snap them to keyframes (default: true)")
+    p_size.add_argument("--cache", action=argparse.BooleanOptionalAction, default=True, help="Reuse cached probe results (default: true)")
+    p_size.add_argument("--jobs", type=int, default=_default_jobs(), help="Max concurrent ffprobe/ffmpeg processes with --from-file (default: half the CPUs)")
     p_size.set_defaults(func=cmd_chunk_size)
 
+    p_batch = sub.add_parser("batch-chunk-size", help="chunk-size over many inputs in parallel")
+    p_batch.add_argument("inputs", nargs="*", help="Input video paths")
+    p_batch.add_argument("--from-file", help="Also process every input listed in this file (one path per line)")
+    p_batch.add_argument("--target-mb", required=True, type=float, help="Approx target chunk size in MB")
+    p_batch.add_argument("--out-dir", default="chunks", help="Output directory (one subdirectory per input)")
+    p_batch.add_argument("--prefix", default="chunk", help="Output file prefix")
+    p_batch.add_argument("--ext", default=None, help="Output extension (default: input ext)")
+    p_batch.add_argument("--copy", action=argparse.BooleanOptionalAction, default=True, help="Stream copy (default: true)")
+    p_batch.add_argument("--min-seconds", type=float, default=None, help="Clamp segment time minimum")
+    p_batch.add_argument("--max-seconds", type=float, default=None, help="Clamp segment time maximum")
+    p_batch.add_argument("--snap-keyframes", action=argparse.BooleanOptionalAction, default=True, help="With --copy, plan cuts from per-packet sizes and snap them to keyframes (default: true)")
+    p_batch.add_argument("--cache", action=argparse.BooleanOptionalAction, default=True, help="Reuse cached probe results (default: true)")
+    p_batch.add_argument("--jobs", type=int, default=_default_jobs(), help="Max concurrent ffprobe/ffmpeg processes (default: half the CPUs)")
+    p_batch.set_defaults(func=cmd_batch_chunk_size)
+
     p_cat = sub.add_parser("concat", help="Join files (same codec/params recommended)")
     p_cat.add_argument("--dir", help="Directory of chunks to concat")
     p_cat.add_argument("inputs", nargs="*", help="Input files to concat in order")
+    p_cat.add_argument("--from-file", help="File listing inputs to concat in order (one path per line)")
     p_cat.add_argument("--ext", default=None, help="If using --dir, only include this extension")
     p_cat.add_argument("--output", required=True, help="Output file path")
     p_cat.add_argument("--copy", action=argparse.BooleanOptionalAction, default=True, help="Stream copy (default: true)")
+    p_cat.add_argument("--check", action=argparse.BooleanOptionalAction, default=False, help="Probe inputs first; with --copy, fail on codec/size mismatch (default: false)")
+    p_cat.add_argument("--jobs", type=int, default=_default_jobs(), help="Max concurrent ffprobe processes for --check (default: half the CPUs)")
+    p_cat.add_argument("--preset", default="faster", help="x264 preset when re-encoding with --no-copy (default: faster)")
     p_cat.set_defaults(func=cmd_concat)
 
     return p
@@ -316,6 +1094,11 @@ def main(argv: list[str]) -> int:
         return 0
     except subprocess.CalledProcessError as e:
         return e.returncode
+    except FileNotFoundError as e:
+        if e.filename not in (_FFMPEG, _FFPROBE):
+            raise
+        print(f"{e.filename} not found; install ffmpeg and make sure it is on PATH", file=sys.stderr)
+        return 127
 
 
 if __name__ == "__main__":